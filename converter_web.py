@@ -6,9 +6,14 @@ import re
 import unicodedata
 import logging
 import argparse
+import contextlib
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import pdfplumber
+from functools import lru_cache
+# pdfplumber/pdfminer (~150 ms importu) i opcjonalny pymupdf (~120 ms) importujemy dopiero
+# w funkcjach ekstrakcji — import modułu dla build_mt940/testów nie płaci za backend PDF.
 
 #lista markerów do odrzucania pseudo‑transakcji
 SUMMARY_MARKERS = [
@@ -18,41 +23,191 @@ SUMMARY_MARKERS = [
     "PODSUMOWANIE KOŃCOWE",
 ]
 
+# polskie nazwy miesięcy (indeks = numer miesiąca) — bez zależności od locale systemu
+POLISH_MONTH_NAMES = [
+    '', 'Styczeń', 'Luty', 'Marzec', 'Kwiecień', 'Maj', 'Czerwiec',
+    'Lipiec', 'Sierpień', 'Wrzesień', 'Październik', 'Listopad', 'Grudzień'
+]
+# stały sufiks referencji w liniach :61:
+MT940_NO_REFERENCE = "//NONREF"
+# backend ekstrakcji tekstu: "pdfplumber" (domyślny, pod niego strojone są parsery) albo "pymupdf"
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pdfplumber").strip().lower()
+# górny limit procesów ekstrakcji tekstu z jednego PDF; domyślnie 1 = ekstrakcja sekwencyjna
+# (serwer obsługuje wiele żądań naraz, więc pula na cpu_count na żądanie nie ma sensu)
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", "1"))
+# minimalna liczba stron na proces przy równoległej ekstrakcji tekstu z PDF
+PARALLEL_MIN_PAGES_PER_WORKER = 4
+# liczba początkowych stron PDF, na których szukamy nagłówka banku
+BANK_DETECTION_PAGES = 2
+# rozmiar cache parsowania dat — wyciąg miesięczny ma najwyżej kilkadziesiąt różnych dat
+DATE_CACHE_SIZE = 128
+# rozmiar cache normalizacji kwot — te same kwoty (opłaty, raty, "0,00") powtarzają się w wyciągu
+AMOUNT_CACHE_SIZE = 1024
+# linie podsumowań Santander pomijane przy zbieraniu opisu
+SANTANDER_SUMMARY_MARKERS = ["DATA WYDRUKU", "WPLYWY LICZBA OPERACJI", "SUMA WPLYWOW", "PODSUMOWANIE"]
+# linie stopki Santander pomijane przy zbieraniu opisu
+SANTANDER_FOOTER_MARKERS = [
+    "DOKUMENT JEST WYDRUKIEM", "SANTANDER BANK POLSKA", "STRONA", "KRS", "NIP", "REGON"
+]
+# początki linii, na których kończy się wieloliniowy blok rachunku / tytułu w opisie Santander
+# (krotki, bo str.startswith sprawdza je wszystkie jednym wywołaniem)
+SANTANDER_ACCOUNT_BLOCK_END = ("DATA KSIĘGOWANIA", "DATA OPERACJI", "TYTUŁ", "Z RACHUNEK", "NA RACHUNEK")
+SANTANDER_TITLE_BLOCK_END = ("Z RACHUNEK", "NA RACHUNEK", "DATA KSIĘGOWANIA", "DATA OPERACJI")
+
+# Zamiany znaków robimy seriami str.replace (z testem "in"), a nie str.translate: translate
+# z tabelą-słownikiem idzie w CPython znak po znaku przez słownik i w pomiarach było od kilku
+# (krótkie kwoty) do ponad stu razy (strona tekstu z polskimi literami) wolniejsze.
+# polskie litery -> ASCII (to samo co NFKD + usunięcie znaków łączących; "ł" NFKD nie rozkłada)
+POLISH_DIACRITICS = tuple(zip("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ"))
+# twarde spacje (NBSP, wąska NBSP, spacja cyfrowa) -> zwykła spacja; spacja zerowej szerokości usuwana
+HARD_SPACE_REPLACEMENTS = (('\xa0', ' '), ('\u202f', ' '), ('\u2007', ' '), ('\u200b', ''))
+
+# Wzorce kompilowane raz przy imporcie (zamiast re.search(r'...') w pętlach)
+UNSAFE_CHARS_RE = re.compile(r'[^A-Za-z0-9\s,\.\-\/\(\)\:\+\%]')
+NON_ALNUM_RE = re.compile(r'[^A-Za-z0-9]')
+THOUSANDS_DOT_RE = re.compile(r'\d\.\d{3}\b')
+CANONICAL_AMOUNT_RE = re.compile(r'-?(?:0|[1-9]\d*)[.,]\d{2}')
+# IBAN PL ze spacjami w dowolnych miejscach (jak wyszukiwanie w tekście po usunięciu spacji)
+IBAN_PL_SPACED_RE = re.compile(r'P *L(?: *\d){26}')
+STATEMENT_NUMBER_RE = re.compile(r'(Numer wyciągu|Nr wyciągu|Wyciąg nr|Wyciąg nr\.\s+)\s*[:\-]?\s*(\d{1,6})', re.I)
+PAGE_NUMBER_RE = re.compile(r'Strona\s*(\d+)/\d+')
+# kwota z dowolnej linii "... PLN"
+PLN_AMOUNT_LINE_RE = re.compile(r'([\-]?\d[\d\s.,]*\d{2})\s*PLN')
+
+# początek operacji Santander: linia "Data operacji ... <kwota> PLN", w kolejnej linii data operacji,
+# w następnej (opcjonalnie) data księgowania; opis operacji to tekst do następnego dopasowania.
+# Kwota zaczyna się tylko od pierwszej cyfry ciągu cyfr/separatorów: jeśli od niej się nie udało,
+# od dalszych cyfr tego ciągu też się nie uda, więc resztę ciągu przeskakujemy atomowo
+# (lookahead + odwołanie wsteczne) — bez tego ciąg liczb bez "PLN" dawał czas kwadratowy.
+SANTANDER_OP_RE = re.compile(
+    r'^[^\S\n]*(?P<header>Data operacji'
+    r'(?:(?:[^\d\n]|(?=(?P<op_run>\d(?:[\d,\.]|[^\S\n])*))(?P=op_run))*?'
+    r'(?P<amount>[-]?\d(?:[\d,\.]|[^\S\n])+\d{2})[^\S\n]*PLN)?[^\n]*)'
+    r'(?:\n(?![^\S\n]*Data operacji)[^\n]*?(?P<op_date>\d{4}-\d{2}-\d{2})[^\n]*'
+    r'(?:\n(?![^\S\n]*Data operacji)[^\n]*?(?P<book_date>\d{4}-\d{2}-\d{2})[^\n]*)?)?',
+    re.M,
+)
+# konto (sekcja "Produkty") oraz saldo początkowe/końcowe Santander w jednym wzorcu;
+# przeskok ciągów cyfr jak w SANTANDER_OP_RE (tylko w obrębie linii etykiety, jak wcześniej .*?)
+SANTANDER_META_RE = re.compile(
+    r'Produkty:\s*(?P<account>\d{2}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4})'
+    r'|(?i:Saldo początkowe)(?:[^\d\n]|(?=(?P<sp_run>\d(?:[\d,\.]|[^\S\n])*))(?P=sp_run))*?'
+    r'(?P<saldo_pocz>[\-]?\d[\d\s,\.]+\d{2})\s*PLN'
+    r'|(?i:Saldo końcowe)(?:[^\d\n]|(?=(?P<sk_run>\d(?:[\d,\.]|[^\S\n])*))(?P=sk_run))*?'
+    r'(?P<saldo_konc>[\-]?\d[\d\s,\.]+\d{2})\s*PLN'
+)
+
+# transakcja Pekao: wiersz "DD/MM/YYYY kwota opis" i kolejne linie opisu aż do pustej linii
+# albo linii zaczynającej się datą
+PEKAO_TX_RE = re.compile(
+    r'^[^\S\n]*(?P<date>\d{2}/\d{2}/\d{4})[^\S\n]+'
+    r'(?P<amount>[\-]?\d{1,3}(?:[\.,]\d{3})*[\.,]\d{2})[^\S\n]+(?P<desc>\S[^\n]*)'
+    r'(?P<cont>(?:\n(?![^\S\n]*(?:\d{2}/\d{2}/\d{4}|$))[^\n]*)*)',
+    re.M,
+)
+# konto oraz saldo początkowe/końcowe Pekao; dopasowania nie wychodzą poza jedną linię
+PEKAO_META_RE = re.compile(
+    r'(?P<account>PL\d{2}(?:[^\S\r\n]?\d{4}){6})'
+    r'|(?i:SALDO POCZĄTKOWE)[^\S\r\n]*[:\-]?[^\S\r\n]*(?P<saldo_pocz>(?:[-\d\.,]|[^\S\r\n])+)'
+    r'|(?i:SALDO KOŃCOWE)[^\S\r\n]*[:\-]?[^\S\r\n]*(?P<saldo_konc>(?:[-\d\.,]|[^\S\r\n])+)'
+)
+
+LOG_FORMAT = '%(levelname)s: %(message)s'
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
+def _extract_page_text(page) -> str:
+    try:
+        return page.extract_text() or ""
+    finally:
+        # Układ strony i cache obiektów zwalniamy od razu, żeby w pamięci była najwyżej jedna strona
+        page.close()
 
-logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
+def _extract_pages_text(pdf_path: str, start: int, stop: int) -> list:
+    import pdfplumber
+    # Każdy proces otwiera PDF samodzielnie — obiekty stron pdfplumber nie są współdzielone
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_extract_page_text(page) for page in pdf.pages[start:stop]]
 
-def parse_pdf_text(pdf_path: str) -> str:
+
+def _extract_pages_text_pymupdf(pdf_path: str, start: int = 0, stop: int = None) -> list:
+    import pymupdf  # opcjonalny, szybszy backend (PDF_BACKEND=pymupdf)
+    with pymupdf.open(pdf_path) as doc:
+        # get_text kończy każdą linię (także ostatnią) znakiem \n — ujednolicamy z pdfplumber
+        return [doc[i].get_text("text").rstrip("\n") for i in range(len(doc))[start:stop]]
+
+
+def _extract_all_pages_text(pdf_path: str, start: int = 0, stop: int = None, max_workers: int = None) -> list:
+    if PDF_BACKEND == "pymupdf":
+        try:
+            return _extract_pages_text_pymupdf(pdf_path, start, stop)
+        except ImportError:
+            logging.warning("PDF_BACKEND=pymupdf, ale pakiet pymupdf nie jest zainstalowany — używam pdfplumber.")
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        indices = range(len(pdf.pages))[start:stop]
+        page_count = len(indices)
+        workers = min(max_workers or PDF_EXTRACT_WORKERS, page_count // PARALLEL_MIN_PAGES_PER_WORKER)
+        if workers < 2:
+            return [_extract_page_text(pdf.pages[i]) for i in indices]
+    # Dłuższe wyciągi: ciągłe zakresy stron ekstrahowane równolegle w osobnych procesach
+    step = -(-page_count // workers)
+    ranges = [(r, min(r + step, indices.stop)) for r in range(indices.start, indices.stop, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as ex:
+        parts = ex.map(_extract_pages_text, [pdf_path] * len(ranges),
+                       [r[0] for r in ranges], [r[1] for r in ranges])
+        return [text for part in parts for text in part]
+
+
+def parse_pdf_pages(pdf_path: str, start: int = 0, stop: int = None, max_workers: int = None) -> list:
+    """Zwraca tekst stron pdf.pages[start:stop] albo None przy błędzie odczytu
+    (pusta lista to poprawny zakres bez stron).
+    max_workers ogranicza liczbę procesów ekstrakcji (domyślnie PDF_EXTRACT_WORKERS)."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            return "\n".join((page.extract_text() or "") for page in pdf.pages)
+        pages = _extract_all_pages_text(pdf_path, start, stop, max_workers)
     except Exception as e:
         logging.error(f"Błąd otwierania lub parsowania PDF: {e}")
-        return ""
+        return None
+    # Twarde spacje zamieniamy na zwykłe — parsery widzą tylko ' '
+    return [_replace_hard_spaces(page) for page in pages]
+
+
+def _replace_hard_spaces(text: str) -> str:
+    for hard, plain in HARD_SPACE_REPLACEMENTS:
+        if hard in text:
+            text = text.replace(hard, plain)
+    return text
+
+
+def parse_pdf_text(pdf_path: str) -> str:
+    return "\n".join(parse_pdf_pages(pdf_path) or [])
 
 
 def remove_diacritics(text: str) -> str:
     if not text:
         return ""
-    nkfd = unicodedata.normalize('NFKD', text)
-    no_comb = "".join([c for c in nkfd if not unicodedata.combining(c)])
-    # Dodatkowe mapowania dla polskich znaków, które po NFKD mogą być utracone/niewłaściwe
-    no_comb = (no_comb
-               .replace('ł', 'l')
-               .replace('Ł', 'L'))
+    # Szybka ścieżka: polskie litery podmieniamy wprost; NFKD tylko dla innych znaków spoza ASCII
+    no_comb = text
+    if not no_comb.isascii():
+        for pl, ascii_ch in POLISH_DIACRITICS:
+            if pl in no_comb:
+                no_comb = no_comb.replace(pl, ascii_ch)
+    if not no_comb.isascii():
+        nkfd = unicodedata.normalize('NFKD', no_comb)
+        no_comb = "".join([c for c in nkfd if not unicodedata.combining(c)])
     # Zachowaj bezpieczny zestaw znaków
-    cleaned = re.sub(r'[^A-Za-z0-9\s,\.\-\/\(\)\:\+\%]', ' ', no_comb)
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    cleaned = UNSAFE_CHARS_RE.sub(' ', no_comb)
+    cleaned = " ".join(cleaned.split())
     return cleaned.upper()
 
 
 def normalize_amount_for_calc(s) -> float:
     if s is None:
         return 0.0
-    ss = str(s).strip()
+    ss = "".join(str(s).split())
     if not ss:
         return 0.0
-    ss = ss.replace('\xa0', '').replace(' ', '')
     neg = False
     if ss.startswith('(') and ss.endswith(')'):
         neg = True
@@ -67,7 +222,7 @@ def normalize_amount_for_calc(s) -> float:
         if ',' in ss and '.' not in ss:
             ss = ss.replace(',', '.')
         # Wzorzec tysiąca, np. 1.234,56 -> usuń kropki tys.
-        if re.search(r'\d\.\d{3}\b', ss):
+        if THOUSANDS_DOT_RE.search(ss):
             ss = ss.replace('.', '')
     try:
         val = float(ss)
@@ -76,10 +231,12 @@ def normalize_amount_for_calc(s) -> float:
     return -val if neg else val
 
 
+@lru_cache(maxsize=AMOUNT_CACHE_SIZE)
 def clean_amount(amount) -> str:
-    s = str(amount).replace('\xa0', '').strip()
-    s = re.sub(r'\s+', '', s)
-    val = normalize_amount_for_calc(s)
+    # Szybka ścieżka: kwota już w postaci kanonicznej (np. "-1234,56") nie wymaga float/format
+    if isinstance(amount, str) and CANONICAL_AMOUNT_RE.fullmatch(amount):
+        return amount.replace('.', ',')
+    val = normalize_amount_for_calc(amount)
     return "{:.2f}".format(val).replace('.', ',')
 
 
@@ -93,10 +250,11 @@ def format_mt940_amount(amount: str) -> str:
 def format_account_for_25(acc_raw) -> str:
     if not acc_raw:
         return "/PL00000000000000000000000000"
-    acc = re.sub(r'[^A-Za-z0-9]', '', str(acc_raw)).upper()
+    acc = NON_ALNUM_RE.sub('', str(acc_raw)).upper()
     if acc.startswith('PL') and len(acc) == 28:
         return f"/{acc}"
-    if re.match(r'^\d{26}$', acc):
+    # acc zawiera już tylko [A-Za-z0-9], więc isdigit() == same cyfry ASCII
+    if len(acc) == 26 and acc.isdigit():
         return f"/PL{acc}"
     if acc.startswith('/'):
         return acc
@@ -139,11 +297,11 @@ def extract_mt940_headers(transactions: list, text: str) -> tuple[str, str]:
         num_20 = datetime.now().strftime('%y%m%d%H%M%S')
 
     num_28C = '00001'
-    m28c = re.search(r'(Numer wyciągu|Nr wyciągu|Wyciąg nr|Wyciąg nr\.\s+)\s*[:\-]?\s*(\d{1,6})', text, re.I)
+    m28c = STATEMENT_NUMBER_RE.search(text)
     if m28c:
         num_28C = m28c.group(2).zfill(5)
     else:
-        page_match = re.search(r'Strona\s*(\d+)/\d+', text)
+        page_match = PAGE_NUMBER_RE.search(text)
         if page_match:
             num_28C = page_match.group(1).zfill(5)
 
@@ -163,20 +321,31 @@ def deduplicate_transactions(transactions: list) -> list:
     return out
 
 
+@lru_cache(maxsize=AMOUNT_CACHE_SIZE)
+def amount_to_cents(amount) -> int:
+    # Uzgadnianie sald liczy grosze dla każdej transakcji — powtarzające się kwoty parsujemy raz.
+    # Kwota kanoniczna ("-1234,56", wynik clean_amount) to liczba całkowita groszy po usunięciu
+    # separatora: bez float, więc dokładnie także dla dużych kwot.
+    if isinstance(amount, str) and CANONICAL_AMOUNT_RE.fullmatch(amount):
+        return int(amount.replace(',', '').replace('.', ''))
+    return int(round(normalize_amount_for_calc(amount) * 100))
+
+
+def balances_reconcile(saldo_pocz, saldo_konc, transactions: list) -> bool:
+    """Sprawdza, czy saldo początkowe + suma transakcji = saldo końcowe (w groszach)."""
+    total = sum(amount_to_cents(t[1]) for t in transactions)
+    return amount_to_cents(saldo_pocz) + total == amount_to_cents(saldo_konc)
+
+
 def format_cd_flag(amount: str) -> str:
     val = normalize_amount_for_calc(amount)
     return 'D' if val < 0 else 'C'
 
 
 def safe_86_text(s: str, maxlen: int = 140) -> str:
-    txt = remove_diacritics(s or '')
-    txt = re.sub(r'[^A-Z0-9\s,\.\-\/\(\)\:\+\%]', ' ', txt)
-    txt = re.sub(r'\s+', ' ', txt).strip()
-    txt = (txt.replace("Ą","A").replace("Ć","C").replace("Ę","E")
-           .replace("Ł","L").replace("Ń","N")
-           .replace("Ó","O").replace("Ś","S")
-           .replace("Ź","Z").replace("Ż","Z"))
-    return txt[:maxlen]
+    # remove_diacritics zwraca już wielkie litery ASCII z dozwolonego zestawu
+    # i pojedyncze spacje, więc ponowne filtrowanie nic by nie zmieniło
+    return remove_diacritics(s or '')[:maxlen]
 
 
 def truncate_description(text: str, maxlen: int = 140) -> str:
@@ -187,90 +356,93 @@ def build_86_segments(description: str) -> str:
     return f":86:/00{safe_86_text(description, 140)}"
 
 
+def _today_yymmdd() -> str:
+    # Bez cache: proces (import modułu, worker --batch) może żyć dłużej niż jeden dzień
+    return datetime.now().strftime("%y%m%d")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _reformat_date(s: str, in_fmt: str, out_fmt: str):
+    # Te same daty powtarzają się w wielu wierszach wyciągu — strptime liczymy raz na datę.
+    # Zła data daje None, a datę zastępczą ("dziś") dokłada wołający: cache jej nie utrwala.
+    try:
+        return datetime.strptime(s, in_fmt).strftime(out_fmt)
+    except ValueError:
+        return None
+
+
+def _parse_pekao_date_to_yymmdd(s: str) -> str:
+    return _reformat_date(s, "%d/%m/%Y", "%y%m%d") or _today_yymmdd()
+
+
 def pekao_parser(text: str):
     account = ""
     saldo_pocz = "0,00"
     saldo_konc = "0,00"
     transactions = []
-    lines = text.splitlines()
-    for line in lines:
-        acc = re.search(r'(PL\d{2}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4})', line)
-        if acc:
-            account = re.sub(r'\s+', '', acc.group(1))
-        sp = re.search(r'SALDO POCZĄTKOWE\s*[:\-]?\s*([-\s\d\.,]+)', line, re.I)
-        if sp:
-            saldo_pocz = clean_amount(sp.group(1))
-        sk = re.search(r'SALDO KOŃCOWE\s*[:\-]?\s*([-\s\d\.,]+)', line, re.I)
-        if sk:
-            saldo_konc = clean_amount(sk.group(1))
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        m_a = re.match(r'^(\d{2}/\d{2}/\d{4})\s+([\-]?\d{1,3}(?:[\.,]\d{3})*[\.,]\d{2})\s+(.*)$', line)
-        if m_a:
-            dt_raw = m_a.group(1)
-            amt_raw = m_a.group(2)
-            desc_lines = [m_a.group(3)]
-            j = i + 1
-            while j < len(lines) and not re.match(r'^\d{2}/\d{2}/\d{4}', lines[j].strip()) and lines[j].strip():
-                desc_lines.append(lines[j].strip())
-                j += 1
-            desc = " ".join(desc_lines).strip()
-            try:
-                dt = datetime.strptime(dt_raw, "%d/%m/%Y").strftime("%y%m%d")
-            except Exception:
-                dt = datetime.now().strftime("%y%m%d")
-            amt = clean_amount(amt_raw)
-            transactions.append((dt, amt, desc, dt[2:6]))  # entry mmdd fallback = same day
-            i = j
+    # Konto i salda jednym przebiegiem po tekście. Jak przy wyszukiwaniu linia po linii:
+    # w linii liczy się pierwsze dopasowanie danego rodzaju, a wygrywa ostatnia taka linia
+    # (np. drugi IBAN w "Rachunek PL.. przelew na PL.." nie nadpisuje konta).
+    line_ends = {}
+    for m in PEKAO_META_RE.finditer(text):
+        kind = m.lastgroup
+        if m.start() < line_ends.get(kind, -1):
             continue
-        i += 1
-    transactions.sort(key=lambda x: (x[0], normalize_amount_for_calc(x[1]), x[2][:50]))
+        line_end = text.find("\n", m.end())
+        line_ends[kind] = len(text) if line_end == -1 else line_end
+        if kind == 'account':
+            account = "".join(m.group('account').split())
+        elif kind == 'saldo_pocz':
+            saldo_pocz = clean_amount(m.group('saldo_pocz'))
+        else:
+            saldo_konc = clean_amount(m.group('saldo_konc'))
+    for m in PEKAO_TX_RE.finditer(text):
+        desc_lines = [m.group('desc')] + m.group('cont').split("\n")[1:]
+        desc = " ".join(l.strip() for l in desc_lines).strip()
+        dt = _parse_pekao_date_to_yymmdd(m.group('date'))
+        amt = clean_amount(m.group('amount'))
+        transactions.append((dt, amt, desc, dt[2:6]))  # entry mmdd fallback = same day
+    # daty YYMMDD sortują się jako tekst; kwoty po clean_amount mają zawsze postać "-1234,56"
+    transactions.sort(key=lambda x: (x[0], float(x[1].replace(',', '.')), x[2][:50]))
     transactions = deduplicate_transactions(transactions)
     num_20, num_28C = extract_mt940_headers(transactions, text)
     # Brak jawnych sald w tym parserze
-    open_d = transactions[0][0] if transactions else datetime.today().strftime("%y%m%d")
+    open_d = transactions[0][0] if transactions else _today_yymmdd()
     close_d = transactions[-1][0] if transactions else open_d
     return account, saldo_pocz, saldo_konc, transactions, num_20, num_28C, open_d, close_d
 
 
 def _strip_spaces(s: str) -> str:
-    return re.sub(r'\s+', ' ', s or '').strip()
+    return " ".join((s or '').split())
 
 
 def _parse_date_text_to_yymmdd(s: str) -> str:
-    # Obsługa formatów: YYYY-MM-DD oraz DD.MM.YYYY
+    # Obsługa formatów: YYYY-MM-DD oraz DD.MM.YYYY. Format wybieramy po kształcie (w ISO
+    # piąty znak to '-'), więc strptime wołamy raz, a wyjątek powstaje tylko dla złej daty.
     s = s.strip()
-    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
-        try:
-            return datetime.strptime(s, fmt).strftime("%y%m%d")
-        except Exception:
-            continue
-    # Jeśli to sama data w postaci YYYY-MM-DD rozbita, spróbuj wyciągnąć
-    m = re.match(r'(\d{4})-(\d{2})-(\d{2})', s)
-    if m:
-        try:
-            return datetime.strptime(s, "%Y-%m-%d").strftime("%y%m%d")
-        except Exception:
-            pass
+    fmt = "%Y-%m-%d" if s[4:5] == "-" else "%d.%m.%Y"
     # Fallback: dziś
-    return datetime.now().strftime("%y%m%d")
+    return _reformat_date(s, fmt, "%y%m%d") or _today_yymmdd()
 
 
 def _parse_date_text_to_iso(s: str) -> str:
     """Zwraca datę w formacie YYYY-MM-DD (ISO)."""
-    try:
-        return datetime.strptime(s.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
-    except Exception:
-        return datetime.now().strftime("%Y-%m-%d")
+    return _reformat_date(s.strip(), "%Y-%m-%d", "%Y-%m-%d") or datetime.now().strftime("%Y-%m-%d")
 
 
 def _parse_amount_pln_from_line(s: str) -> str:
-    m = re.search(r'([\-]?\d[\d\s.,]*\d{2})\s*PLN', s)
+    m = PLN_AMOUNT_LINE_RE.search(s)
     return clean_amount(m.group(1)) if m else "0,00"
     
 
 
+def find_compact_iban(text: str):
+    # Pierwszy IBAN PL w tekście, zwracany bez spacji. Szukamy wprost w tekście ze spacjami,
+    # bez kopii całego dokumentu.
+    m = IBAN_PL_SPACED_RE.search(text)
+    return m.group(0).replace(' ', '') if m else None
+
+
 def normalize_contrahent(line: str) -> str:
     line = line.strip()
     # lista markerów po których ucinamy
@@ -288,49 +460,42 @@ def santander_parser(text: str):
     saldo_konc = "0,00"
     transactions = []
 
-    # Numer konta – priorytetowo z sekcji "Produkty"
-    prod_match = re.search(r'Produkty:\s*(\d{2}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4}\s?\d{4})', text)
-    if prod_match:
-        account = re.sub(r'\s+', '', prod_match.group(1))
+    # Numer konta (sekcja "Produkty") i salda z PDF jednym przebiegiem — pierwsze wystąpienie wygrywa
+    prod_account = sp_raw = sk_raw = None
+    for m in SANTANDER_META_RE.finditer(text):
+        if m.group('account') and prod_account is None:
+            prod_account = m.group('account')
+        elif m.group('saldo_pocz') and sp_raw is None:
+            sp_raw = m.group('saldo_pocz')
+        elif m.group('saldo_konc') and sk_raw is None:
+            sk_raw = m.group('saldo_konc')
+        if prod_account is not None and sp_raw is not None and sk_raw is not None:
+            break
+
+    if prod_account:
+        account = "".join(prod_account.split())
     else:
-        iban_match = re.search(r'(PL\d{26})', text.replace(" ", ""))
-        if iban_match:
-            account = iban_match.group(1)
-
-    # Salda z PDF
-    sp_match = re.search(r'Saldo początkowe.*?([\-]?\d[\d\s,\.]+\d{2})\s*PLN', text, re.I)
-    if sp_match:
-        saldo_pocz = clean_amount(sp_match.group(1))
-    sk_match = re.search(r'Saldo końcowe.*?([\-]?\d[\d\s,\.]+\d{2})\s*PLN', text, re.I)
-    if sk_match:
-        saldo_konc = clean_amount(sk_match.group(1))
-
-    lines = [l.strip() for l in text.splitlines()]
-    pending_op = False
-    desc_lines = []
-    amt = "0,00"
-    current_oper_date = None
-    current_oper_date_iso = None
-    current_book_date = None
-
-    STOPKA_MARKERS = [
-        "DOKUMENT JEST WYDRUKIEM", "SANTANDER BANK POLSKA", "STRONA", "KRS", "NIP", "REGON"
-    ]
+        account = find_compact_iban(text) or account
+    if sp_raw:
+        saldo_pocz = clean_amount(sp_raw)
+    if sk_raw:
+        saldo_konc = clean_amount(sk_raw)
 
     def build_desc(desc_lines, op_date_iso):
+        # upper() liczymy raz na linię, a nie przy każdym porównaniu
+        upper_lines = [l.upper() for l in desc_lines]
+        n = len(desc_lines)
+
         def collect_block(start_line, keyword):
             """Zbiera linię zaczynającą się od keyword + kolejne linie z nazwą kontrahenta."""
             result = []
-            for idx, l in enumerate(desc_lines):
-                if l.upper().startswith(keyword):
-                    block = l
+            for idx, line_up in enumerate(upper_lines):
+                if line_up.startswith(keyword):
+                    # szukamy końca bloku, a linie sklejamy jednym join zamiast += w pętli
                     j = idx + 1
-                    while j < len(desc_lines) and not any(desc_lines[j].upper().startswith(x) for x in [
-                        "DATA KSIĘGOWANIA", "DATA OPERACJI", "TYTUŁ", "Z RACHUNEK", "NA RACHUNEK"
-                    ]):
-                        block += " " + desc_lines[j]
+                    while j < n and not upper_lines[j].startswith(SANTANDER_ACCOUNT_BLOCK_END):
                         j += 1
-                    result.append(block.strip())
+                    result.append(" ".join(desc_lines[idx:j]).strip())
             return result
 
         # zbierz pełne bloki
@@ -339,16 +504,12 @@ def santander_parser(text: str):
 
         # tytuł może być wieloliniowy
         full_tytul = ""
-        for idx, l in enumerate(desc_lines):
-            if l.upper().startswith("TYTUŁ"):
-                full_tytul = l
+        for idx, line_up in enumerate(upper_lines):
+            if line_up.startswith("TYTUŁ"):
                 j = idx + 1
-                while j < len(desc_lines) and not any(desc_lines[j].upper().startswith(x) for x in [
-                    "Z RACHUNEK", "NA RACHUNEK", "DATA KSIĘGOWANIA", "DATA OPERACJI"
-                ]):
-                    full_tytul += " " + desc_lines[j]
+                while j < n and not upper_lines[j].startswith(SANTANDER_TITLE_BLOCK_END):
                     j += 1
-                full_tytul = full_tytul.strip()
+                full_tytul = " ".join(desc_lines[idx:j]).strip()
                 break
 
         # jeśli tytuł to tylko "Umowa", dopisz kontrahenta z linii "Na rachunek"
@@ -368,59 +529,31 @@ def santander_parser(text: str):
         desc = _strip_spaces(" // ".join(parts))
         return desc if desc else "Operacja bankowa"
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if any(x in line.upper() for x in ["DATA WYDRUKU", "WPLYWY LICZBA OPERACJI", "SUMA WPLYWOW", "PODSUMOWANIE"]):
-            i += 1
-            continue
-
-        if line.startswith("Data operacji"):
-            # zamknij poprzedni blok
-            if pending_op and current_oper_date:
-                desc = build_desc(desc_lines, current_oper_date_iso)
-                gvc = map_transaction_code(desc)
-                entry_mmdd = current_book_date[2:6] if current_book_date else current_oper_date[2:6]
-                transactions.append((current_oper_date, amt, desc, entry_mmdd, gvc))
-
-            pending_op = True
-            desc_lines = []
-
-            # kwota z tej samej linii
-            m_amt = re.search(r'([-]?\d[\d\s,\.]+\d{2})\s*PLN', line)
-            amt = clean_amount(m_amt.group(1)) if m_amt else "0,00"
-
-            current_oper_date = None
-            current_oper_date_iso = None
-            current_book_date = None
-
-            # Data operacji ma iść do :61:, a data księgowania do entry date (MMDD), jeśli dostępna.
-            if i + 1 < len(lines):
-                op_match = re.search(r'(\d{4}-\d{2}-\d{2})', lines[i+1])
-                if op_match:
-                    current_oper_date = _parse_date_text_to_yymmdd(op_match.group(1))
-                    current_oper_date_iso = _parse_date_text_to_iso(op_match.group(1))
-                    i += 1  # przeskocz linię z datą operacji
-            if i + 1 < len(lines):
-                book_match = re.search(r'(\d{4}-\d{2}-\d{2})', lines[i+1])
-                if book_match:
-                    current_book_date = _parse_date_text_to_yymmdd(book_match.group(1))
-                    i += 1  # przeskocz linię z datą księgowania
-
-            i += 1
+    def is_summary_line(line):
+        line_up = line.upper()
+        return any(x in line_up for x in SANTANDER_SUMMARY_MARKERS)
+
+    def is_desc_line(line):
+        line_up = line.upper()
+        return not (any(x in line_up for x in SANTANDER_SUMMARY_MARKERS)
+                    or any(x in line_up for x in SANTANDER_FOOTER_MARKERS))
+
+    # Jeden finditer daje nagłówek z kwotą i obie daty; opis to tekst do następnej operacji.
+    # Nagłówek w linii podsumowania nie otwiera nowej operacji (linia zostaje w poprzednim
+    # bloku i jest pomijana).
+    ops = [m for m in SANTANDER_OP_RE.finditer(text) if not is_summary_line(m.group('header'))]
+    for k, m in enumerate(ops):
+        # Data operacji ma iść do :61:, a data księgowania do entry date (MMDD), jeśli dostępna.
+        if not m.group('op_date'):
             continue
-
-        if pending_op:
-            if any(marker in line.upper() for marker in STOPKA_MARKERS):
-                i += 1
-                continue
-            if line:
-                desc_lines.append(line)
-
-        i += 1
-
-    # zamknięcie ostatniego bloku
-    if pending_op and current_oper_date:
+        amt = clean_amount(m.group('amount')) if m.group('amount') else "0,00"
+        current_oper_date = _parse_date_text_to_yymmdd(m.group('op_date'))
+        current_oper_date_iso = _parse_date_text_to_iso(m.group('op_date'))
+        current_book_date = _parse_date_text_to_yymmdd(m.group('book_date')) if m.group('book_date') else None
+
+        end = ops[k + 1].start() if k + 1 < len(ops) else len(text)
+        desc_lines = [line for line in (l.strip() for l in text[m.end():end].splitlines())
+                      if line and is_desc_line(line)]
         desc = build_desc(desc_lines, current_oper_date_iso)
         gvc = map_transaction_code(desc)
         entry_mmdd = current_book_date[2:6] if current_book_date else current_oper_date[2:6]
@@ -440,36 +573,47 @@ def santander_parser(text: str):
     return account, saldo_pocz, saldo_konc, transactions, num_20, num_28C, open_d, close_d
 
 
-def detect_bank(text: str) -> str:
+# Kolejność ma znaczenie: pierwszy pasujący bank wygrywa (najpierw słowa kluczowe, potem kod z IBAN).
+# parser = None oznacza bank rozpoznawany, ale jeszcze nieobsługiwany.
+BANK_SIGNATURES = [
+    # (nazwa, słowa kluczowe, kod banku w IBAN, parser)
+    ("Pekao", ("PEKAO", "BANK POLSKA KASA OPIEKI"), "1240", pekao_parser),
+    ("mBank", ("MBANK", "BRE BANK"), "1140", None),
+    ("Santander", ("SANTANDER", "BZWBK"), "1090", santander_parser),
+    ("PKO BP", ("PKO BP", "POWSZECHNA KASA OSZCZEDNOSCI"), "1020", None),
+    ("ING", ("ING",), "1050", None),  # "ING" obejmuje też "ING BANK"
+    ("Alior", ("ALIOR",), "2490", None),
+]
+
+# Słowa kluczowe nie mogą sąsiadować z literą: gołe "ING" nie trafia w "LEASING" czy "BILLING",
+# a nazwy sklejone z cyframi ("PEKAO24", "BZWBK24", "MBANK24") nadal pasują
+BANK_KEYWORD_RES = {
+    name: re.compile(r'(?<![^\W\d_])(?:' + '|'.join(map(re.escape, keywords)) + r')(?![^\W\d_])')
+    for name, keywords, _, _ in BANK_SIGNATURES
+}
+
+
+def detect_bank_parser(text: str) -> tuple:
+    """Zwraca (nazwa banku, funkcja parsera lub None)."""
+    # Cały tekst w kolejności BANK_SIGNATURES — bank wyżej na liście wygrywa, nawet jeśli
+    # słowo kluczowe innego banku stoi wcześniej w nagłówku (np. "ING" w tytule przelewu)
+    # Tani test "in" odsiewa banki bez żadnego słowa kluczowego; regex sprawdzający sąsiednie litery
+    # uruchamiamy tylko dla kandydatów
     text_up = text.upper()
-    if "PEKAO" in text_up or "BANK POLSKA KASA OPIEKI" in text_up:
-        return "Pekao"
-    if "MBANK" in text_up or "BRE BANK" in text_up:
-        return "mBank"
-    if "SANTANDER" in text_up or "BZWBK" in text_up:
-        return "Santander"
-    if "PKO BP" in text_up or "POWSZECHNA KASA OSZCZEDNOSCI" in text_up:
-        return "PKO BP"
-    if "ING BANK" in text_up or "ING" in text_up:
-        return "ING"
-    if "ALIOR" in text_up:
-        return "Alior"
-    iban_match = re.search(r'PL(\d{2})(\d{4})\d{20}', text.replace(' ', ''))
-    if iban_match:
-        bank_code = iban_match.group(2)
-        if bank_code == "1240":
-            return "Pekao"
-        if bank_code == "1140":
-            return "mBank"
-        if bank_code == "1090":
-            return "Santander"
-        if bank_code == "1020":
-            return "PKO BP"
-        if bank_code == "1050":
-            return "ING"
-        if bank_code == "2490":
-            return "Alior"
-    return "Nieznany"
+    for name, keywords, _, parser in BANK_SIGNATURES:
+        if any(k in text_up for k in keywords) and BANK_KEYWORD_RES[name].search(text_up):
+            return name, parser
+    iban = find_compact_iban(text)
+    if iban:
+        bank_code = iban[4:8]
+        for name, _, code, parser in BANK_SIGNATURES:
+            if code == bank_code:
+                return name, parser
+    return "Nieznany", None
+
+
+def detect_bank(text: str) -> str:
+    return detect_bank_parser(text)[0]
 
 
 def _amount_sign_and_value(amount_str: str):
@@ -478,11 +622,10 @@ def _amount_sign_and_value(amount_str: str):
     a value to kwota bez znaku (z przecinkiem).
     """
     amt = amount_str.strip()
-    is_negative = amt.startswith("-")
-    # usuwamy minus do value
-    value = amt.lstrip("-")
-    sign = "D" if is_negative else "C"
-    return sign, value
+    # clean_amount zwraca co najwyżej jeden wiodący minus — jedno sprawdzenie wystarcza
+    if amt[:1] == "-":
+        return "D", amt[1:]
+    return "C", amt
 
 
 def build_mt940(account, saldo_pocz, saldo_konc, transactions, num_20, num_28C, open_d, close_d):
@@ -504,62 +647,67 @@ def build_mt940(account, saldo_pocz, saldo_konc, transactions, num_20, num_28C,
     # Transakcje
     for d, a, desc, mmdd, gvc in transactions:
         t_sign, t_value = _amount_sign_and_value(a)
-        lines.append(f":61:{d}{t_sign}{t_value}{gvc}//NONREF")
-        if desc.strip():
+        lines.append(f":61:{d}{t_sign}{t_value}{gvc}{MT940_NO_REFERENCE}")
+        if desc and not desc.isspace():
             lines.append(build_86_segments(desc))
         else:
             lines.append(":86:")
 
-    # Saldo końcowe
+    # Saldo końcowe — :62F: i :64: mają tę samą treść, składamy ją raz
     sk_sign, sk_value = _amount_sign_and_value(saldo_konc)
-    lines.append(f":62F:{sk_sign}{close_d}PLN{sk_value}")
-    lines.append(f":64:{sk_sign}{close_d}PLN{sk_value}")
+    closing = f"{sk_sign}{close_d}PLN{sk_value}"
+    lines.append(":62F:" + closing)
+    lines.append(":64:" + closing)
     lines.append("-")
 
     return "\n".join(lines)
 
 
 def save_mt940_file(mt940_text: str, output_path: str) -> None:
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    # CRLF i kodowanie liczymy raz dla całego tekstu, zapis jednym write() w trybie binarnym
+    crlf_text = mt940_text.replace("\n", "\r\n")
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="windows-1250", newline="\r\n") as f:
-            f.write(mt940_text)
-    except Exception as e:
+        data = crlf_text.encode("windows-1250")
+    except UnicodeEncodeError as e:
         logging.error(f"Błąd zapisu w Windows-1250: {e}. Zapisuję w UTF-8.")
-        with open(output_path, "w", encoding="utf-8", newline="\r\n") as f:
-            f.write(mt940_text)
-
-
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Konwerter PDF do MT940")
-    parser.add_argument("input_pdf", help="Ścieżka do pliku wejściowego PDF.")
-    parser.add_argument("output_mt940", help="Ścieżka do pliku wyjściowego MT940.")
-    parser.add_argument("--debug", action="store_true", help="Tryb debugowania")
-    args = parser.parse_args()
+        data = crlf_text.encode("utf-8")
+    with open(output_path, "wb") as f:
+        f.write(data)
+
+
+def convert_pdf(input_pdf: str, output_path: str, debug: bool = False, max_workers: int = None) -> int:
+    """Konwertuje jeden wyciąg PDF do pliku MT940. Zwraca kod wyjścia CLI
+    (0 = sukces, 2 = brak tekstu w PDF, 3 = bank nieobsługiwany)."""
+    # Bank rozpoznajemy najpierw po pierwszych stronach (nagłówek wyciągu). Gdy nie dają one
+    # banku z parserem, rozpoznajemy jeszcze raz na pełnym tekście, zanim zwrócimy kod 3.
+    pages = parse_pdf_pages(input_pdf, stop=BANK_DETECTION_PAGES, max_workers=max_workers)
+    bank_name, bank_parser = detect_bank_parser("\n".join(pages or []))
+    if pages is not None and len(pages) == BANK_DETECTION_PAGES:
+        rest = parse_pdf_pages(input_pdf, start=BANK_DETECTION_PAGES, max_workers=max_workers)
+        # Błąd dalszych stron to błąd całego pliku: z samych pierwszych stron powstałby
+        # ucięty wyciąg zakończony kodem 0
+        pages = pages + rest if rest is not None else None
+    text = "\n".join(pages or [])
+    if text and bank_parser is None:
+        bank_name, bank_parser = detect_bank_parser(text)
 
-    if args.debug:
-        logging.getLogger().setLevel(logging.DEBUG)
-
-    text = parse_pdf_text(args.input_pdf)
     if not text:
         logging.error("Brak tekstu z PDF — upewnij się, że pdfplumber odczytuje strony.")
-        sys.exit(2)
+        return 2
 
-    bank_name = detect_bank(text)
-    if args.debug:
+    if debug:
         print("\n=== WYPIS EKSTRAKTU Z PDF (DEBUG) ===")
         print(text[:4000])
         print(f"\n>>> Wykryty bank: {bank_name}\n")
         print("============================\n")
 
-    if bank_name == "Santander":
-        account, sp, sk, tx, num_20, num_28C, open_d, close_d = santander_parser(text)
-        #account, sp, sk, tx, num_20, num_28C, open_d, close_d = santander_parser(args.input_pdf)
-    elif bank_name == "Pekao":
-        account, sp, sk, tx, num_20, num_28C, open_d, close_d = pekao_parser(text)
-    else:
+    if bank_parser is None:
         logging.error(f"Bank {bank_name} nieobsługiwany lub nierozpoznany.")
-        sys.exit(3)
+        return 3
+    account, sp, sk, tx, num_20, num_28C, open_d, close_d = bank_parser(text)
 
     # Informacje pomocnicze
     print(f"Daty transakcji: {[t[0] for t in tx]}")
@@ -567,11 +715,7 @@ def main() -> None:
         first_tx_date = tx[0][0]
         try:
             parsed_date = datetime.strptime(first_tx_date, '%y%m%d')
-            month_names = [
-                '', 'Styczeń', 'Luty', 'Marzec', 'Kwiecień', 'Maj', 'Czerwiec',
-                'Lipiec', 'Sierpień', 'Wrzesień', 'Październik', 'Listopad', 'Grudzień'
-            ]
-            statement_month = f"{month_names[parsed_date.month]} {parsed_date.year}"
+            statement_month = f"{POLISH_MONTH_NAMES[parsed_date.month]} {parsed_date.year}"
         except Exception as e:
             print(f"BŁĄD DATY wyciągu: {first_tx_date} – {e}")
             statement_month = "Nieznany"
@@ -590,13 +734,92 @@ def main() -> None:
     print(f"Liczba linii ':61:' w pliku: {len(lines_61)}")
 
     # Zapis
-    save_mt940_file(mt940, args.output_mt940)
-    print(f"Plik zapisany: {os.path.exists(args.output_mt940)} {args.output_mt940}")
-    print(f"✅ Konwersja zakończona! Plik zapisany jako {args.output_mt940} (kodowanie WINDOWS-1250/UTF-8, separator CRLF).")
+    save_mt940_file(mt940, output_path)
+    print(f"Plik zapisany: {os.path.exists(output_path)} {output_path}")
+    print(f"✅ Konwersja zakończona! Plik zapisany jako {output_path} (kodowanie WINDOWS-1250/UTF-8, separator CRLF).")
     
     print(f"Saldo początkowe z PDF: {sp}")
     print(f"Saldo końcowe z PDF: {sk}")
     print(f"Liczba transakcji po filtracji: {len(tx)}")
+    if not balances_reconcile(sp, sk, tx):
+        logging.warning("Saldo początkowe + suma transakcji nie zgadza się z saldem końcowym z PDF.")
+    return 0
+
+
+def _convert_batch_item(input_pdf: str, output_path: str, debug: bool) -> tuple:
+    # Pliki wsadu są już rozłożone na procesy — w środku ekstrahujemy strony sekwencyjnie.
+    # Wydruki i logi zbieramy do bufora, żeby rodzic wypisał je w całości, plik po pliku,
+    # zamiast przeplatać wyjście kilku procesów.
+    buf = io.StringIO()
+    root = logging.getLogger()
+    saved_handlers = root.handlers[:]
+    handler = logging.StreamHandler(buf)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.handlers = [handler]
+    try:
+        with contextlib.redirect_stdout(buf):
+            try:
+                code = convert_pdf(input_pdf, output_path, debug, max_workers=1)
+            except Exception as e:
+                logging.exception(f"{input_pdf}: {e}")
+                code = 1
+    finally:
+        root.handlers = saved_handlers
+    return code, buf.getvalue()
+
+
+def convert_batch(input_pdfs: list, output_dir: str, debug: bool = False) -> int:
+    """Konwertuje wiele wyciągów równolegle (proces na plik); wynik trafia do
+    output_dir/<nazwa>.mt940. Zwraca najwyższy kod wyjścia spośród plików.
+    ValueError, gdy dwa pliki wejściowe dałyby ten sam plik wyjściowy."""
+    output_paths = [os.path.join(output_dir, os.path.splitext(os.path.basename(p))[0] + ".mt940")
+                    for p in input_pdfs]
+    seen = {}
+    for input_pdf, output_path in zip(input_pdfs, output_paths):
+        key = os.path.normcase(output_path)
+        if key in seen:
+            raise ValueError(f"{seen[key]} i {input_pdf} dałyby ten sam plik wyjściowy {output_path}")
+        seen[key] = input_pdf
+    workers = min(os.cpu_count() or 1, len(input_pdfs))
+    if workers < 2:
+        results = [_convert_batch_item(p, o, debug) for p, o in zip(input_pdfs, output_paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_convert_batch_item, input_pdfs, output_paths, [debug] * len(input_pdfs)))
+    codes = []
+    for input_pdf, output_path, (code, output) in zip(input_pdfs, output_paths, results):
+        sys.stdout.write(output)
+        status = "OK" if code == 0 else f"BŁĄD (kod {code})"
+        print(f"{status}: {input_pdf} -> {output_path}")
+        codes.append(code)
+    return max(codes, default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Konwerter PDF do MT940")
+    parser.add_argument("input_pdf", nargs="+",
+                        help="Ścieżka do pliku wejściowego PDF (z --batch: jeden lub więcej plików).")
+    parser.add_argument("output_mt940",
+                        help="Ścieżka do pliku wyjściowego MT940 (z --batch: katalog wyjściowy).")
+    parser.add_argument("--batch", action="store_true",
+                        help="Tryb wsadowy: konwertuje wiele plików PDF równolegle do katalogu wyjściowego")
+    parser.add_argument("--debug", action="store_true", help="Tryb debugowania")
+    args = parser.parse_args()
+
+    if args.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if args.batch:
+        try:
+            code = convert_batch(args.input_pdf, args.output_mt940, args.debug)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        if len(args.input_pdf) != 1:
+            parser.error("bez --batch podaj dokładnie jeden plik PDF i plik wyjściowy")
+        code = convert_pdf(args.input_pdf[0], args.output_mt940, args.debug)
+    if code:
+        sys.exit(code)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,92 @@
+import contextlib
+import io
+import os
+import tempfile
 import unittest
+from datetime import datetime
+from unittest import mock
 
-from converter_web import build_mt940, format_account_for_25
+import converter_web
+from converter_web import (
+    amount_to_cents,
+    balances_reconcile,
+    build_mt940,
+    clean_amount,
+    convert_batch,
+    convert_pdf,
+    detect_bank,
+    format_account_for_25,
+    parse_pdf_pages,
+    parse_pdf_text,
+    pekao_parser,
+    santander_parser,
+    save_mt940_file,
+)
+
+
+SANTANDER_TEXT = """Santander Bank Polska S.A.
+Produkty: 12 1090 1014 0000 0712 1981 2874
+Saldo początkowe 10 000,00 PLN
+Saldo końcowe 11 265,44 PLN
+Data operacji Kwota -1 234,56 PLN
+2026-04-02
+Data księgowania 2026-04-03
+Tytuł: Opłata za fakturę 04/2026
+numer klienta 991
+Na rachunek: 11 1140 2004 0000 3102 7654 3210 FIRMA
+XYZ SPÓŁKA Z O.O.
+Data operacji Kwota 2 500,00 PLN
+2026-04-05
+2026-04-05
+Tytuł: Wynagrodzenie
+Z rachunek: 22 1020 0000 0000 0000 0000 0001 JAN KOWALSKI
+"""
+
+PEKAO_TEXT = """Bank Polska Kasa Opieki S.A.
+Rachunek PL12 1240 1037 1111 0010 1234 5678
+SALDO POCZĄTKOWE: 1.000,00
+02/04/2026 -1.234,56 Przelew do FIRMA XYZ
+Faktura 04/2026
+NIP 1234567890
+05/04/2026 2.500,00 Wynagrodzenie
+
+SALDO KOŃCOWE: 2.265,44
+"""
+
+
+def write_text_pdf(path, *pages):
+    # Minimalny PDF: każdy fragment (x, tekst) to osobny operator Tj, jak w wyciągach bankowych
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(len(pages))), len(pages)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, lines in enumerate(pages):
+        runs = []
+        y = 800
+        for line in lines:
+            for x, text in line:
+                text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+                runs.append("BT /F1 10 Tf 1 0 0 1 %d %d Tm (%s) Tj ET" % (x, y, text))
+            y -= 14
+        content = "\n".join(runs).encode("latin-1")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> >>" % (5 + 2 * i))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
 
 
 class Mt940BuildTests(unittest.TestCase):
@@ -10,6 +96,24 @@ class Mt940BuildTests(unittest.TestCase):
             "/PL12345678901234567890123456",
         )
 
+    def test_clean_amount_drops_spaces_and_thousand_separators(self):
+        self.assertEqual(clean_amount("1\xa0234,56"), "1234,56")
+        self.assertEqual(clean_amount(" -12 345.678,90 "), "-12345678,90")
+        self.assertEqual(clean_amount("(3\u202f000,00)"), "-3000,00")
+
+    def test_balances_reconcile_in_cents(self):
+        transactions = [
+            ("260401", "-125,10", "Oplata", "0401", "N775"),
+            ("260402", "3000,20", "Wplyw", "0402", "N524"),
+        ]
+        self.assertTrue(balances_reconcile("1000,00", "3875,10", transactions))
+        self.assertFalse(balances_reconcile("1000,00", "3875,00", transactions))
+
+    def test_amount_to_cents_is_exact_for_large_amounts(self):
+        self.assertEqual(amount_to_cents("-1234,56"), -123456)
+        self.assertEqual(amount_to_cents("90071992547409,93"), 9007199254740993)
+        self.assertEqual(amount_to_cents("1 234,5"), 123450)
+
     def test_build_mt940_contains_required_tags(self):
         transactions = [
             ("260401", "-125,00", "Oplata za prowadzenie rachunku", "0401", "N775"),
@@ -37,6 +141,188 @@ class Mt940BuildTests(unittest.TestCase):
         self.assertEqual(len(lines_61), 2)
         self.assertEqual(len(lines_86), 2)
 
+    def test_parse_pdf_pages_in_worker_processes_keeps_page_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "wyciag.pdf")
+            write_text_pdf(pdf_path, *[[[(40, f"Strona {i}")]] for i in range(1, 9)])
+            sequential = parse_pdf_pages(pdf_path)
+            parallel = parse_pdf_pages(pdf_path, max_workers=2)
+
+        self.assertEqual(sequential, [f"Strona {i}" for i in range(1, 9)])
+        self.assertEqual(parallel, sequential)
+
+    def test_santander_parser_reads_balances_and_multiline_descriptions(self):
+        account, saldo_pocz, saldo_konc, tx, _, _, open_d, close_d = santander_parser(SANTANDER_TEXT)
+
+        self.assertEqual(account, "12109010140000071219812874")
+        self.assertEqual((saldo_pocz, saldo_konc), ("10000,00", "11265,44"))
+        self.assertEqual((open_d, close_d), ("260402", "260405"))
+        self.assertEqual(tx, [
+            ("260402", "-1234,56",
+             "Data operacji 2026-04-02 // Tytuł: Opłata za fakturę 04/2026 numer klienta 991"
+             " // Na rachunek: 11 1140 2004 0000 3102 7654 3210 FIRMA XYZ SPÓŁKA Z O.O.",
+             "0403", "N775"),
+            ("260405", "2500,00",
+             "Data operacji 2026-04-05 // Tytuł: Wynagrodzenie"
+             " // Z rachunek: 22 1020 0000 0000 0000 0000 0001 JAN KOWALSKI",
+             "0405", "NTRF"),
+        ])
+
+    def test_pekao_parser_reads_balances_and_multiline_descriptions(self):
+        account, saldo_pocz, saldo_konc, tx, _, _, open_d, close_d = pekao_parser(PEKAO_TEXT)
+
+        self.assertEqual(account, "PL12124010371111001012345678")
+        self.assertEqual((saldo_pocz, saldo_konc), ("1000,00", "2265,44"))
+        self.assertEqual((open_d, close_d), ("260402", "260405"))
+        self.assertEqual([t[:3] for t in tx], [
+            ("260402", "-1234,56", "Przelew do FIRMA XYZ Faktura 04/2026 NIP 1234567890"),
+            ("260405", "2500,00", "Wynagrodzenie"),
+        ])
+
+    def test_pekao_parser_takes_first_iban_of_the_account_line(self):
+        text = PEKAO_TEXT.replace(
+            "Rachunek PL12 1240 1037 1111 0010 1234 5678",
+            "Rachunek PL12 1240 1037 1111 0010 1234 5678 przelew na PL99 1240 1037 1111 0010 1234 5678",
+        )
+        self.assertEqual(pekao_parser(text)[0], "PL12124010371111001012345678")
+
+    def test_fallback_date_follows_the_clock_in_a_long_running_process(self):
+        text = "31/02/2026 10,00 Zla data\n"
+        dates = []
+        for today in (datetime(2026, 4, 30, 23, 59), datetime(2026, 5, 1, 0, 1)):
+            class FrozenDatetime(datetime):
+                @classmethod
+                def now(cls, tz=None):
+                    return today
+
+            with mock.patch("converter_web.datetime", FrozenDatetime):
+                dates.append(pekao_parser(text)[3][0][0])
+
+        self.assertEqual(dates, ["260430", "260501"])
+
+    def test_detect_bank_keeps_priority_and_matches_ing_as_word(self):
+        self.assertEqual(detect_bank("Tytul: rata ING\nSantander Bank Polska S.A."), "Santander")
+        self.assertEqual(detect_bank("Rata LEASING, BILLING\nPKO BP S.A."), "PKO BP")
+        self.assertEqual(detect_bank("ING Bank Slaski S.A."), "ING")
+        self.assertEqual(detect_bank("Oplata za LEASING"), "Nieznany")
+        self.assertEqual(detect_bank("Wyciag BZWBK24"), "Santander")
+        self.assertEqual(detect_bank("Bank Pekao24"), "Pekao")
+        self.assertEqual(detect_bank("mBank24"), "mBank")
+        self.assertEqual(detect_bank("Pekao24 S.A.\nPL61 1090 1014 0000 0712 1981 2874"), "Pekao")
+
+    def test_save_mt940_file_writes_crlf_windows_1250(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_path = os.path.join(tmp, "nested", "out.mt940")
+            save_mt940_file(":20:1\n:86:/00ŁÓDŹ\n-", out_path)
+            with open(out_path, "rb") as f:
+                data = f.read()
+
+        self.assertEqual(data, ":20:1\r\n:86:/00ŁÓDŹ\r\n-".encode("windows-1250"))
+
+    def test_convert_batch_returns_highest_exit_code(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            not_pdf = os.path.join(tmp, "wyciag.pdf")
+            with open(not_pdf, "w", encoding="utf-8") as f:
+                f.write("to nie jest PDF")
+            code = convert_batch([not_pdf], os.path.join(tmp, "out"))
+            self.assertFalse(os.path.exists(os.path.join(tmp, "out", "wyciag.mt940")))
+
+        self.assertEqual(code, 2)
+
+    def test_convert_batch_in_worker_processes_prints_results_in_input_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sant_pdf = os.path.join(tmp, "santander.pdf")
+            write_text_pdf(sant_pdf, [
+                [(40, "Santander Bank Polska")],
+                [(40, "Data operacji"), (200, "-1 234,56 PLN")],
+                [(40, "2026-04-01")],
+                [(40, "Tytul: Oplata za konto")],
+            ])
+            not_pdf = os.path.join(tmp, "zly.pdf")
+            with open(not_pdf, "w", encoding="utf-8") as f:
+                f.write("to nie jest PDF")
+            out_dir = os.path.join(tmp, "out")
+
+            with mock.patch("converter_web.os.cpu_count", return_value=2), \
+                    contextlib.redirect_stdout(io.StringIO()) as out:
+                code = convert_batch([sant_pdf, not_pdf], out_dir)
+
+            self.assertTrue(os.path.exists(os.path.join(out_dir, "santander.mt940")))
+            self.assertFalse(os.path.exists(os.path.join(out_dir, "zly.mt940")))
+
+        self.assertEqual(code, 2)
+        output = out.getvalue()
+        sant_log = output.index("Wykryty bank: Santander")
+        sant_ok = output.index(f"OK: {sant_pdf}")
+        bad_log = output.index("ERROR: Brak tekstu z PDF")
+        bad_status = output.index(f"BŁĄD (kod 2): {not_pdf}")
+        self.assertTrue(sant_log < sant_ok < bad_log < bad_status)
+
+    def test_convert_batch_rejects_inputs_with_the_same_output_name(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                convert_batch([os.path.join(tmp, "a", "wyciag.pdf"), os.path.join(tmp, "b", "wyciag.pdf")], tmp)
+
+    def test_parse_pdf_text_keeps_single_spaces_between_text_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "wyciag.pdf")
+            write_text_pdf(pdf_path, [
+                [(40, "Santander Bank Polska")],
+                [(40, "Data "), (67, "operacji"), (200, "-1 234,56 PLN")],
+                [(40, "Tytul: Oplata "), (110, "za konto")],
+            ])
+            text = parse_pdf_text(pdf_path)
+
+        self.assertIn("Data operacji -1 234,56 PLN", text)
+        self.assertIn("Tytul: Oplata za konto", text)
+        self.assertNotIn("  ", text)
+
+    def test_convert_pdf_detects_again_on_full_text_when_header_bank_has_no_parser(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "wyciag.pdf")
+            out_path = os.path.join(tmp, "wyciag.mt940")
+            write_text_pdf(
+                pdf_path,
+                [[(40, "Wyciag z rachunku PKO BP")]],
+                [[(40, "Strona 2")]],
+                [
+                    [(40, "Santander Bank Polska")],
+                    [(40, "Data operacji"), (200, "-1 234,56 PLN")],
+                    [(40, "2026-04-01")],
+                    [(40, "Tytul: Oplata za konto")],
+                ],
+            )
+            with contextlib.redirect_stdout(io.StringIO()) as out, self.assertLogs(level="WARNING"):
+                code = convert_pdf(pdf_path, out_path)
+
+            self.assertEqual(code, 0)
+            self.assertTrue(os.path.exists(out_path))
+        self.assertIn("Wykryty bank: Santander", out.getvalue())
+
+    def test_convert_pdf_returns_2_when_later_pages_fail_to_extract(self):
+        extract = converter_web._extract_all_pages_text
+
+        def fail_after_detection_pages(pdf_path, start=0, stop=None, max_workers=None):
+            if start >= 2:
+                raise OSError("uszkodzona strona")
+            return extract(pdf_path, start, stop, max_workers)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "wyciag.pdf")
+            out_path = os.path.join(tmp, "wyciag.mt940")
+            operation = [
+                [(40, "Data operacji"), (200, "-12,00 PLN")],
+                [(40, "2026-04-01")],
+                [(40, "Tytul: Oplata")],
+            ]
+            write_text_pdf(pdf_path, [[(40, "Santander Bank Polska")]] + operation, operation, operation)
+            with mock.patch("converter_web._extract_all_pages_text", fail_after_detection_pages), \
+                    contextlib.redirect_stdout(io.StringIO()), self.assertLogs(level="ERROR"):
+                code = convert_pdf(pdf_path, out_path)
+
+            self.assertEqual(code, 2)
+            self.assertFalse(os.path.exists(out_path))
+
 
 if __name__ == "__main__":
     unittest.main()